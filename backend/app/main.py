@@ -1,34 +1,78 @@
 """
 Path Payment Terminal API Emulator - Main FastAPI Application
 """
+import math
 import os
-from fastapi import FastAPI
-from fastapi.staticfiles import StaticFiles
-from fastapi.responses import FileResponse, HTMLResponse
+from typing import Any
+from fastapi import FastAPI, Request
+from fastapi.encoders import jsonable_encoder
+from fastapi.exceptions import RequestValidationError
+from fastapi.responses import JSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
 
-from .routers import auth, payment, reversal, completion, loyalty, auto_reversal, websocket
+from .routers import auth, payment, reversal, completion, loyalty, auto_reversal, websocket, admin, preauth
+from .services.audit_log import close_audit_logger
+from .services.lifecycle import DrainMiddleware, get_drain_controller
+from .services.profiler import ProfilingMiddleware, get_profiler
+from .services.terminal_emulator import get_emulator
+
+# APP_PROFILE=api serves only the API and WebSocket routes (no frontend, no docs)
+APP_PROFILE = os.getenv("APP_PROFILE", "full").lower()
+# FAST_START=true defers emulator construction until the first request. Routers
+# are still imported here: FastAPI needs every route registered before serving,
+# and import time is dominated by FastAPI itself, not by the routers.
+FAST_START = os.getenv("FAST_START", "false").lower() == "true"
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Lifespan events"""
     # Startup
+    if not FAST_START:
+        get_emulator()
+    get_profiler().start_loop_monitor()
     yield
-    # Shutdown
+    # Shutdown - no drain here: uvicorn has already closed open connections by
+    # the time the lifespan exits, so POST /api/v1/admin/drain is the only
+    # supported way to drain before a redeploy
+    await get_profiler().stop_loop_monitor()
+    close_audit_logger()
+
 
+docs_enabled = APP_PROFILE != "api"
 
 app = FastAPI(
     title="Path Payment Terminal API Emulator",
     description="API emulator for testing iOS/Android payment terminal integrations",
     version="1.0.0",
     lifespan=lifespan,
-    docs_url="/docs",
-    redoc_url="/redoc",
-    openapi_url="/openapi.json"
+    docs_url="/docs" if docs_enabled else None,
+    redoc_url="/redoc" if docs_enabled else None,
+    openapi_url="/openapi.json" if docs_enabled else None
 )
 
+def _finite(value: Any) -> Any:
+    """Replace Infinity/NaN floats with strings so they can be encoded as JSON"""
+    if isinstance(value, float) and not math.isfinite(value):
+        return str(value)
+    if isinstance(value, dict):
+        return {key: _finite(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_finite(item) for item in value]
+    return value
+
+
+@app.exception_handler(RequestValidationError)
+async def validation_exception_handler(request: Request, exc: RequestValidationError):
+    """FastAPI's default 422, but safe when the rejected input is Infinity or NaN"""
+    return JSONResponse(status_code=422, content={"detail": _finite(jsonable_encoder(exc.errors()))})
+
+
+# In-flight tracking and 503s for new API requests while draining. Added before
+# CORS so CORS wraps it and the 503s carry CORS headers for browser clients.
+app.add_middleware(DrainMiddleware, controller=get_drain_controller())
+
 # CORS middleware
 app.add_middleware(
     CORSMiddleware,
@@ -38,18 +82,28 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Per-request phase timing (PROFILING_ENABLED=true)
+if get_profiler().enabled:
+    app.add_middleware(ProfilingMiddleware, profiler=get_profiler())
+
 # Include routers
 app.include_router(auth.router)
 app.include_router(payment.router)
+app.include_router(preauth.router)
 app.include_router(reversal.router)
 app.include_router(completion.router)
 app.include_router(loyalty.router)
 app.include_router(auto_reversal.router)
 app.include_router(websocket.router)
+app.include_router(admin.router)
 
 # Serve frontend
 frontend_path = os.path.join(os.path.dirname(__file__), "..", "..", "frontend")
-if os.path.exists(frontend_path):
+if APP_PROFILE != "api" and os.path.exists(frontend_path):
+    # Imported here so the API-only profile never loads the static file machinery
+    from fastapi.staticfiles import StaticFiles
+    from fastapi.responses import HTMLResponse
+
     @app.get("/", response_class=HTMLResponse)
     async def read_root():
         index_path = os.path.join(frontend_path, "index.html")
@@ -60,14 +114,19 @@ if os.path.exists(frontend_path):
                 content = content.replace('/assets/', '/static/')
                 return content
         return "<html><body><h1>Path Payment Terminal API Emulator</h1><p>Frontend not found</p></body></html>"
-    
+
     # Serve static files from frontend directory (only mount once)
     app.mount("/static", StaticFiles(directory=frontend_path), name="static")
 
 
 @app.get("/health")
 async def health():
-    """Health check endpoint"""
+    """Health check endpoint - reports 503 while draining so load balancers stop routing here"""
+    if get_drain_controller().draining:
+        return JSONResponse(
+            status_code=503,
+            content={"status": "draining", "service": "Path Payment Terminal API Emulator"}
+        )
     return {"status": "healthy", "service": "Path Payment Terminal API Emulator"}
 
 
@@ -75,4 +134,3 @@ if __name__ == "__main__":
     import uvicorn
     port = int(os.getenv("PORT", "8000"))
     uvicorn.run(app, host="0.0.0.0", port=port)
-
@@ -64,3 +64,27 @@ class LoyaltyRequest(BaseRequest):
     cmd: str = Field(default="Loyalty", description="Loyalty command")
     args: Dict[str, Any] = Field(..., description="Loyalty arguments")
 
+
+
+class ClockAdvanceRequest(BaseModel):
+    """Admin request - fast-forward the virtual clock"""
+    seconds: float = Field(..., ge=0, le=10 * 365 * 24 * 3600, allow_inf_nan=False,
+                           description="Seconds to advance the virtual clock by (at most 10 years)")
+
+
+class ProfileRequest(BaseModel):
+    """Admin request - run a time-boxed sampling profile"""
+    seconds: float = Field(default=5.0, gt=0, le=60, description="How long to sample for")
+    interval_ms: float = Field(default=5.0, ge=1, le=1000, description="Sampling interval in milliseconds")
+
+
+class ConfigUpdateRequest(BaseModel):
+    """Admin request - change emulator settings at runtime (omitted fields are unchanged)"""
+    ack_only: Optional[bool] = Field(None, description="Send only ACK responses")
+    response_delay_ms: Optional[int] = Field(None, ge=0, description="Simulated terminal processing delay")
+    session_timeout_minutes: Optional[int] = Field(None, gt=0, description="Session timeout in minutes")
+
+
+class DrainRequest(BaseModel):
+    """Admin request - drain the emulator before a redeploy"""
+    timeout_seconds: float = Field(default=30.0, gt=0, le=600, description="Maximum wait for in-flight commands")
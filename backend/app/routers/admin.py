@@ -0,0 +1,112 @@
+"""
+Admin endpoints - clock control, profiling, runtime configuration, drain and FX rates
+"""
+import asyncio
+import threading
+from fastapi import APIRouter, HTTPException
+from typing import Dict, Any
+from ..models.requests import ClockAdvanceRequest, ConfigUpdateRequest, DrainRequest, ProfileRequest
+from ..services.clock import VirtualClock
+from ..services.lifecycle import get_drain_controller
+from ..services.profiler import get_profiler
+from ..services.terminal_emulator import get_emulator
+
+router = APIRouter(prefix="/api/v1/admin", tags=["Admin"])
+
+
+@router.get("/clock", response_model=Dict[str, Any])
+async def get_clock():
+    """Report the active clock mode and current emulator time"""
+    emulator = get_emulator()
+    return {
+        "mode": emulator.clock.mode,
+        "now": emulator.clock.isoformat()
+    }
+
+
+@router.post("/clock/advance", response_model=Dict[str, Any])
+async def advance_clock(request: ClockAdvanceRequest):
+    """Fast-forward the virtual clock (requires CLOCK_MODE=virtual)"""
+    emulator = get_emulator()
+    if not isinstance(emulator.clock, VirtualClock):
+        raise HTTPException(status_code=400, detail="Clock is not virtual - set CLOCK_MODE=virtual")
+
+    try:
+        emulator.clock.advance(request.seconds)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {
+        "mode": emulator.clock.mode,
+        "now": emulator.clock.isoformat(),
+        "expired_holds": emulator.hold_manager.expire_due()
+    }
+
+
+@router.get("/slow-requests", response_model=Dict[str, Any])
+async def slow_requests(limit: int = 20):
+    """The slowest recent requests with per-phase breakdowns (requires PROFILING_ENABLED=true)"""
+    profiler = get_profiler()
+    return {
+        "enabled": profiler.enabled,
+        "buffered": len(profiler.recent),
+        "loop_lag": profiler.loop_lag,
+        "requests": profiler.slowest(limit)
+    }
+
+
+@router.post("/profile", response_model=Dict[str, Any])
+async def sample_profile(request: ProfileRequest):
+    """Sample the event loop thread's stacks for a fixed time and return the hottest stacks"""
+    loop_thread = threading.get_ident()
+    try:
+        return await asyncio.to_thread(
+            get_profiler().sample, loop_thread, request.seconds, request.interval_ms
+        )
+    except RuntimeError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+
+
+@router.get("/config", response_model=Dict[str, Any])
+async def get_config():
+    """Current emulator configuration"""
+    return get_emulator().config.to_dict()
+
+
+@router.post("/config", response_model=Dict[str, Any])
+async def update_config(request: ConfigUpdateRequest):
+    """Atomically apply new settings; requests already in flight keep the old ones"""
+    try:
+        config = get_emulator().update_config(**request.model_dump())
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return config.to_dict()
+
+
+@router.post("/drain", response_model=Dict[str, Any])
+async def drain(request: DrainRequest):
+    """Stop accepting commands, wait for in-flight ones and close WebSockets"""
+    return await get_drain_controller().drain(request.timeout_seconds)
+
+
+@router.post("/resume", response_model=Dict[str, Any])
+async def resume():
+    """Leave drain mode and accept commands again"""
+    get_drain_controller().resume()
+    return {"draining": False}
+
+
+@router.get("/fx", response_model=Dict[str, Any])
+async def get_fx():
+    """Loaded FX rate table and conversion cache statistics"""
+    return get_emulator().fx.info()
+
+
+@router.post("/fx/reload", response_model=Dict[str, Any])
+async def reload_fx():
+    """Reload the FX rate table from FX_RATES_PATH without blocking requests"""
+    fx = get_emulator().fx
+    try:
+        await fx.reload_async()
+    except (OSError, ValueError) as e:
+        raise HTTPException(status_code=400, detail=f"Failed to load FX rates: {e}")
+    return fx.info()
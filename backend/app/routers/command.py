@@ -0,0 +1,57 @@
+"""
+Shared ACK/result flow for the REST command endpoints
+
+Every command endpoint acknowledges the request, optionally processes it and
+returns {"ack": ..., "result": ...}. This module owns that flow, including
+audit logging, profiling phases and error handling, so the routers only
+describe what is specific to each command.
+"""
+import logging
+import time
+from fastapi import HTTPException
+from typing import Any, Callable, Dict, Optional
+from ..models.requests import BaseRequest
+from ..services.audit_log import get_audit_logger
+from ..services.profiler import profile_phase
+from ..services.terminal_emulator import TerminalEmulator, get_emulator
+
+logger = logging.getLogger(__name__)
+
+
+def handle_command(request: BaseRequest, expected_cmd: Optional[str] = None,
+                   process: Optional[Callable[[TerminalEmulator, Dict[str, Any]], Dict[str, Any]]] = None,
+                   session_id: Optional[str] = None) -> Dict[str, Any]:
+    """Acknowledge a command and, unless in ACK_ONLY mode, return its result
+
+    `process` receives the emulator and the request args. Without it only the
+    ACK is returned (used by the *Response endpoints).
+    """
+    emulator = get_emulator()
+    audit = get_audit_logger()
+    started = time.perf_counter()
+    # Snapshot the config so a reload mid-request cannot split ACK and result
+    config = emulator.config
+    try:
+        if expected_cmd is not None and request.cmd != expected_cmd:
+            audit.record(emulator.create_ack(request.req_id, request.cmd, accepted=False), started, session_id)
+            raise HTTPException(status_code=400, detail=f"Command must be '{expected_cmd}'")
+
+        with profile_phase("ack"):
+            ack = emulator.create_ack(request.req_id, request.cmd, accepted=True)
+            audit.record(ack, started, session_id)
+        if process is None:
+            return {"ack": ack, "result": None}
+
+        with profile_phase("process"):
+            result = process(emulator, request.args or {})
+        if not emulator.should_send_result(config):
+            return {"ack": ack, "result": None}
+
+        audit.record(result, started, session_id)
+        return {"ack": ack, "result": result}
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.exception("%s request %s failed", request.cmd, request.req_id)
+        audit.record_error(request.cmd, request.req_id, started, e, session_id)
+        raise HTTPException(status_code=500, detail=str(e))
@@ -1,43 +1,24 @@
 """
 Completion Advice endpoints
 """
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter
 from typing import Dict, Any
 from ..models.requests import BaseRequest
-from ..services.terminal_emulator import get_emulator
+from .command import handle_command
 
 router = APIRouter(prefix="/api/v1/completion", tags=["Completion"])
-emulator = get_emulator()  # Use shared singleton instance
 
 
 @router.post("", response_model=Dict[str, Any])
 async def completion(request: BaseRequest):
     """CompletionRequest - Finalize and capture a previously authorized transaction"""
-    try:
-        if request.cmd != "Completion":
-            raise HTTPException(status_code=400, detail="Command must be 'Completion'")
-        
-        ack = emulator.create_ack(request.req_id, request.cmd, accepted=True)
-        result = emulator.process_completion(request.req_id, request.args or {})
-        
-        return {
-            "ack": ack,
-            "result": result if emulator.should_send_result() else None
-        }
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+    return handle_command(
+        request, "Completion",
+        lambda emulator, args: emulator.process_completion(request.req_id, args)
+    )
 
 
 @router.post("/response", response_model=Dict[str, Any])
 async def completion_response(request: BaseRequest):
     """CompletionResponse - Handle completion response"""
-    try:
-        ack = emulator.create_ack(request.req_id, request.cmd, accepted=True)
-        
-        return {
-            "ack": ack,
-            "result": None
-        }
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
-
+    return handle_command(request)
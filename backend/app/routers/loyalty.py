@@ -1,43 +1,24 @@
 """
 Loyalty Management endpoints
 """
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter
 from typing import Dict, Any
 from ..models.requests import BaseRequest
-from ..services.terminal_emulator import get_emulator
+from .command import handle_command
 
 router = APIRouter(prefix="/api/v1/loyalty", tags=["Loyalty"])
-emulator = get_emulator()  # Use shared singleton instance
 
 
 @router.post("", response_model=Dict[str, Any])
 async def loyalty(request: BaseRequest):
     """LoyaltyRequest - Manage loyalty cards, points, discounts"""
-    try:
-        if request.cmd != "Loyalty":
-            raise HTTPException(status_code=400, detail="Command must be 'Loyalty'")
-        
-        ack = emulator.create_ack(request.req_id, request.cmd, accepted=True)
-        result = emulator.process_loyalty(request.req_id, request.args or {})
-        
-        return {
-            "ack": ack,
-            "result": result if emulator.should_send_result() else None
-        }
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+    return handle_command(
+        request, "Loyalty",
+        lambda emulator, args: emulator.process_loyalty(request.req_id, args)
+    )
 
 
 @router.post("/response", response_model=Dict[str, Any])
 async def loyalty_response(request: BaseRequest):
     """LoyaltyResponse - Handle loyalty response"""
-    try:
-        ack = emulator.create_ack(request.req_id, request.cmd, accepted=True)
-        
-        return {
-            "ack": ack,
-            "result": None
-        }
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
-
+    return handle_command(request)
@@ -0,0 +1,29 @@
+"""
+Pre-Authorization endpoints - PreAuth, IncrementalAuth
+"""
+from fastapi import APIRouter
+from typing import Dict, Any
+from ..models.requests import BaseRequest
+from .command import handle_command
+
+router = APIRouter(prefix="/api/v1/preauth", tags=["Pre-Authorization"])
+
+
+@router.post("", response_model=Dict[str, Any])
+async def preauth(request: BaseRequest):
+    """PreAuthRequest - Place a hold to be captured later by Completion"""
+    session_id = (request.args or {}).get("session_id")
+    return handle_command(
+        request, "PreAuth",
+        lambda emulator, args: emulator.process_preauth(request.req_id, args, session_id),
+        session_id
+    )
+
+
+@router.post("/incremental", response_model=Dict[str, Any])
+async def incremental_auth(request: BaseRequest):
+    """IncrementalAuthRequest - Increase an open pre-authorization hold"""
+    return handle_command(
+        request, "IncrementalAuth",
+        lambda emulator, args: emulator.process_incremental_auth(request.req_id, args)
+    )
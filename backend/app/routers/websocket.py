@@ -2,88 +2,126 @@
 WebSocket endpoint for real-time bidirectional communication
 """
 import json
+import logging
+import time
 from fastapi import APIRouter, WebSocket, WebSocketDisconnect
 from typing import Dict, Any
+from ..services.audit_log import get_audit_logger
+from ..services.lifecycle import get_drain_controller
+from ..services.profiler import get_profiler, profile_phase
 from ..services.terminal_emulator import get_emulator
 
 router = APIRouter()
-emulator = get_emulator()  # Use shared singleton instance
+logger = logging.getLogger(__name__)
 
 
 @router.websocket("/ws")
 async def websocket_endpoint(websocket: WebSocket):
     """WebSocket endpoint for real-time terminal emulation"""
+    emulator = get_emulator()
+    audit = get_audit_logger()
+    profiler = get_profiler()
+    drain = get_drain_controller()
+    if drain.draining:
+        # 1013 (try again later) - reconnect once the new instance is up
+        await websocket.close(code=1013)
+        return
     await websocket.accept()
+    drain.register(websocket)
     
     try:
         while True:
             # Receive message from client
             data = await websocket.receive_text()
+            with drain.track():
+                started = time.perf_counter()
+                profile = profiler.begin("/ws")
+                # Snapshot the config so a reload mid-message cannot split ACK and result
+                config = emulator.config
             
-            try:
-                obj = json.loads(data)
-            except json.JSONDecodeError:
-                await websocket.send_json({
-                    "type": "error",
-                    "reason": "invalid_json",
-                    "detail": "Failed to parse JSON"
-                })
-                continue
+                try:
+                    with profile_phase("parse"):
+                        obj = json.loads(data)
+                except json.JSONDecodeError:
+                    await websocket.send_json({
+                        "type": "error",
+                        "reason": "invalid_json",
+                        "detail": "Failed to parse JSON"
+                    })
+                    profiler.end(profile)
+                    continue
             
-            cmd = str(obj.get("cmd", "")).strip()
-            req_id = str(obj.get("req_id", "")).strip()
-            args = obj.get("args", {})
+                cmd = str(obj.get("cmd", "")).strip()
+                req_id = str(obj.get("req_id", "")).strip()
+                args = obj.get("args", {})
+                audit_session = args.get("session_id") if isinstance(args, dict) else None
             
-            # Known commands
-            known = cmd in ("Sale", "Refund", "Reversal", "Login", "Logout", 
-                          "Cancellation", "Completion", "AutoReversal", "Loyalty")
+                # Known commands
+                known = cmd in ("Sale", "Refund", "Reversal", "Login", "Logout", 
+                              "Cancellation", "Completion", "AutoReversal", "Loyalty",
+                              "PreAuth", "IncrementalAuth")
             
-            # Send ACK
-            ack = emulator.create_ack(req_id, cmd, accepted=known)
-            await websocket.send_json(ack)
+                # Send ACK
+                with profile_phase("ack"):
+                    ack = emulator.create_ack(req_id, cmd, accepted=known and not drain.draining)
+                    await websocket.send_json(ack)
+                    audit.record(ack, started, audit_session)
             
-            # Process command if known and not ACK_ONLY
-            if known and emulator.should_send_result():
-                try:
-                    if cmd == "Login":
-                        result = emulator.process_login(req_id, args)
-                    elif cmd == "Logout":
-                        session_id = args.get("session_id")
-                        result = emulator.process_logout(req_id, session_id)
-                    elif cmd == "Sale":
-                        session_id = args.get("session_id")
-                        result = emulator.process_sale(req_id, args, session_id)
-                    elif cmd == "Refund":
-                        session_id = args.get("session_id")
-                        result = emulator.process_refund(req_id, args, session_id)
-                    elif cmd == "Reversal":
-                        result = emulator.process_reversal(req_id, args)
-                    elif cmd == "Cancellation":
-                        result = emulator.process_cancellation(req_id, args)
-                    elif cmd == "Completion":
-                        result = emulator.process_completion(req_id, args)
-                    elif cmd == "AutoReversal":
-                        result = emulator.process_auto_reversal(req_id, args)
-                    elif cmd == "Loyalty":
-                        result = emulator.process_loyalty(req_id, args)
-                    else:
-                        result = None
+                # Process command if known and not ACK_ONLY
+                if known and not drain.draining and emulator.should_send_result(config):
+                    try:
+                        with profile_phase("process"):
+                            if cmd == "Login":
+                                result = emulator.process_login(req_id, args)
+                            elif cmd == "Logout":
+                                session_id = args.get("session_id")
+                                result = emulator.process_logout(req_id, session_id)
+                            elif cmd == "Sale":
+                                session_id = args.get("session_id")
+                                result = emulator.process_sale(req_id, args, session_id)
+                            elif cmd == "Refund":
+                                session_id = args.get("session_id")
+                                result = emulator.process_refund(req_id, args, session_id)
+                            elif cmd == "PreAuth":
+                                session_id = args.get("session_id")
+                                result = emulator.process_preauth(req_id, args, session_id)
+                            elif cmd == "IncrementalAuth":
+                                result = emulator.process_incremental_auth(req_id, args)
+                            elif cmd == "Reversal":
+                                result = emulator.process_reversal(req_id, args)
+                            elif cmd == "Cancellation":
+                                result = emulator.process_cancellation(req_id, args)
+                            elif cmd == "Completion":
+                                result = emulator.process_completion(req_id, args)
+                            elif cmd == "AutoReversal":
+                                result = emulator.process_auto_reversal(req_id, args)
+                            elif cmd == "Loyalty":
+                                result = emulator.process_loyalty(req_id, args)
+                            else:
+                                result = None
                     
-                    if result:
-                        await websocket.send_json(result)
-                except Exception as e:
-                    await websocket.send_json({
-                        "type": "result",
-                        "req_id": req_id,
-                        "cmd": cmd,
-                        "status": "fail",
-                        "reason": "exception",
-                        "detail": str(e)
-                    })
+                        if result:
+                            with profile_phase("send"):
+                                await websocket.send_json(result)
+                            audit.record(result, started, audit_session)
+                    except Exception as e:
+                        logger.exception("%s request %s failed", cmd, req_id)
+                        audit.record_error(cmd, req_id, started, e, audit_session)
+                        await websocket.send_json({
+                            "type": "result",
+                            "req_id": req_id,
+                            "cmd": cmd,
+                            "status": "fail",
+                            "reason": "exception",
+                            "detail": str(e)
+                        })
+            
+                profiler.end(profile)
                     
     except WebSocketDisconnect:
         pass
     except Exception as e:
+        logger.exception("WebSocket connection failed")
         try:
             await websocket.send_json({
                 "type": "error",
@@ -92,4 +130,6 @@ async def websocket_endpoint(websocket: WebSocket):
             })
         except:
             pass
+    finally:
+        drain.unregister(websocket)
 
@@ -0,0 +1,168 @@
+"""
+Structured audit log of every ACK and result sent by the emulator
+
+Entries are JSON lines written by a background thread, so the request path
+only pays for building a small dict and a non-blocking queue put.
+"""
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import time
+import zlib
+from datetime import datetime
+from typing import Any, Dict, Optional
+from .clock import Clock, RealClock
+from .terminal_emulator import get_emulator
+
+logger = logging.getLogger(__name__)
+
+
+class _JsonLineFormatter(logging.Formatter):
+    """Formats an audit entry dict as a single JSON line (runs on the writer thread)"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = dict(record.msg)
+        # Stamped with the emulator clock's epoch on the request path, formatted here
+        entry["ts"] = datetime.fromtimestamp(entry["ts"]).isoformat()
+        return json.dumps(entry, default=str)
+
+
+class _DroppingQueueHandler(logging.handlers.QueueHandler):
+    """Queue handler that drops entries instead of blocking when the queue is full"""
+
+    def __init__(self, q: queue.Queue):
+        super().__init__(q)
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Formatting happens on the writer thread, not on the request path
+        return record
+
+    def enqueue(self, record: logging.LogRecord):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+class AuditLogger:
+    """Queue-backed audit log with sampling and size-based rotation"""
+
+    def __init__(self, path: Optional[str] = None, sample_rate: float = 1.0,
+                 max_bytes: int = 10 * 1024 * 1024, backup_count: int = 5,
+                 queue_size: int = 10000, clock: Optional[Clock] = None):
+        self.path = path
+        # Same clock as the emulator, so audit timestamps match response `ts` fields
+        self.clock = clock or RealClock()
+        self.sample_rate = min(max(sample_rate, 0.0), 1.0)
+        self._threshold = int(self.sample_rate * 0xFFFFFFFF)
+        self._listener = None
+        self._handler = None
+        self._file_handler = None
+        self._logger = logging.getLogger("path_emulator.audit")
+        self._logger.propagate = False
+
+        if path:
+            try:
+                self._file_handler = logging.handlers.RotatingFileHandler(
+                    path, maxBytes=max_bytes, backupCount=backup_count, encoding="utf-8"
+                )
+            except OSError as e:
+                # A bad path must not take every command down with it
+                logger.warning("Audit log disabled - cannot open %s: %s", path, e)
+                return
+            self._file_handler.setFormatter(_JsonLineFormatter())
+            q: queue.Queue = queue.Queue(maxsize=queue_size)
+            self._handler = _DroppingQueueHandler(q)
+            self._logger.addHandler(self._handler)
+            self._logger.setLevel(logging.INFO)
+            self._listener = logging.handlers.QueueListener(q, self._file_handler)
+            self._listener.start()
+
+    @property
+    def enabled(self) -> bool:
+        return self._listener is not None
+
+    @property
+    def dropped(self) -> int:
+        """Entries dropped because the writer fell behind"""
+        return self._handler.dropped if self._handler else 0
+
+    def sampled(self, req_id: str) -> bool:
+        """Sampling is keyed on req_id so an ACK and its result are kept or dropped together"""
+        if self.sample_rate >= 1.0:
+            return True
+        return zlib.crc32(req_id.encode()) <= self._threshold
+
+    def record(self, message: Dict[str, Any], started: float, session_id: Optional[str] = None):
+        """Record an ACK or result message; `started` is the request's perf_counter() start"""
+        if not self.enabled:
+            return
+        status = message.get("status")
+        req_id = str(message.get("req_id", ""))
+        # Rejections and failures are always kept, whatever the sample rate
+        if status in ("accepted", "success") and not self.sampled(req_id):
+            return
+        self._logger.info({
+            "kind": message.get("type"),
+            "cmd": message.get("cmd"),
+            "req_id": req_id,
+            "session": session_id or message.get("session_id"),
+            "txn_id": message.get("txn_id"),
+            "status": status,
+            "latency_ms": round((time.perf_counter() - started) * 1000, 3),
+            "ts": self.clock.time()
+        })
+
+    def record_error(self, cmd: str, req_id: str, started: float, error: Exception,
+                     session_id: Optional[str] = None):
+        """Record a request that failed with an exception"""
+        if not self.enabled:
+            return
+        self._logger.info({
+            "kind": "error",
+            "cmd": cmd,
+            "req_id": req_id,
+            "session": session_id,
+            "txn_id": None,
+            "status": "error",
+            "detail": f"{type(error).__name__}: {error}",
+            "latency_ms": round((time.perf_counter() - started) * 1000, 3),
+            "ts": self.clock.time()
+        })
+
+    def close(self):
+        """Flush pending entries and stop the writer thread"""
+        if self._listener:
+            self._listener.stop()
+            self._listener = None
+            self._logger.removeHandler(self._handler)
+            self._file_handler.close()
+
+
+# Shared singleton instance
+_audit_instance = None
+
+def get_audit_logger() -> AuditLogger:
+    """Get the shared audit logger, configured from AUDIT_* environment variables"""
+    global _audit_instance
+    if _audit_instance is None:
+        _audit_instance = AuditLogger(
+            path=os.getenv("AUDIT_LOG_PATH") or None,
+            sample_rate=float(os.getenv("AUDIT_SAMPLE_RATE", "1.0")),
+            max_bytes=int(os.getenv("AUDIT_LOG_MAX_BYTES", str(10 * 1024 * 1024))),
+            backup_count=int(os.getenv("AUDIT_LOG_BACKUP_COUNT", "5")),
+            queue_size=int(os.getenv("AUDIT_QUEUE_SIZE", "10000")),
+            clock=get_emulator().clock
+        )
+    return _audit_instance
+
+
+def close_audit_logger():
+    """Flush and close the shared audit logger (called on application shutdown)"""
+    global _audit_instance
+    if _audit_instance is not None:
+        _audit_instance.close()
+        _audit_instance = None
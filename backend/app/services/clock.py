@@ -0,0 +1,128 @@
+"""
+Injectable time sources for the terminal emulator
+
+All emulator and session timestamps go through a Clock so that tests can
+swap in a cached or virtual clock instead of reading the system time.
+"""
+import os
+import time
+from datetime import datetime, timedelta
+from typing import Optional
+
+
+class Clock:
+    """Base time source - wraps the system clock"""
+    mode = "real"
+
+    def now(self) -> datetime:
+        """Current local datetime"""
+        return datetime.now()
+
+    def time(self) -> float:
+        """Current epoch time in seconds"""
+        return time.time()
+
+    def monotonic(self) -> float:
+        """Monotonic seconds, for measuring elapsed time"""
+        return time.monotonic()
+
+    def isoformat(self) -> str:
+        """Current time as an ISO 8601 string (used for `ts` fields)"""
+        return self.now().isoformat()
+
+
+class RealClock(Clock):
+    """System clock, read on every call"""
+
+
+class CachedClock(Clock):
+    """Coarse system clock that refreshes its readings once per tick
+
+    Every call within the same tick returns the same datetime, epoch and
+    `ts` string, so the ISO formatting cost is paid once per tick rather
+    than once per response.
+    """
+    mode = "cached"
+
+    def __init__(self, tick_ms: int = 1000):
+        self.tick = tick_ms / 1000.0
+        self._next_refresh = 0.0
+        self._refresh(time.monotonic())
+
+    def _refresh(self, mono: float):
+        self._epoch = time.time()
+        self._now = datetime.fromtimestamp(self._epoch)
+        self._iso = self._now.isoformat()
+        self._next_refresh = mono + self.tick
+
+    def _check(self):
+        mono = time.monotonic()
+        if mono >= self._next_refresh:
+            self._refresh(mono)
+
+    def now(self) -> datetime:
+        self._check()
+        return self._now
+
+    def time(self) -> float:
+        self._check()
+        return self._epoch
+
+    def isoformat(self) -> str:
+        self._check()
+        return self._iso
+
+
+class VirtualClock(Clock):
+    """Manually driven clock for fast-forward testing
+
+    Time stands still until `advance()` or `set()` is called, so hours of
+    terminal time (session timeouts, hold expiry) can be simulated in seconds.
+    """
+    mode = "virtual"
+
+    def __init__(self, start: Optional[datetime] = None):
+        start = start or datetime.now()
+        self._epoch = start.timestamp()
+        self._mono = 0.0
+
+    def now(self) -> datetime:
+        return datetime.fromtimestamp(self._epoch)
+
+    def time(self) -> float:
+        return self._epoch
+
+    def monotonic(self) -> float:
+        return self._mono
+
+    def advance(self, seconds: float) -> datetime:
+        """Move the clock forward by the given number of seconds
+        
+        The clock is left untouched if the new time cannot be represented.
+        """
+        if seconds < 0:
+            raise ValueError("Virtual clock cannot move backwards")
+        epoch = self._epoch + seconds
+        try:
+            now = datetime.fromtimestamp(epoch)
+        except (OverflowError, OSError, ValueError):
+            raise ValueError(f"Virtual clock cannot advance {seconds} seconds past {self.now().isoformat()}")
+        self._epoch = epoch
+        self._mono += seconds
+        return now
+
+    def set(self, when: datetime) -> datetime:
+        """Jump the clock forward to an absolute datetime"""
+        return self.advance((when - self.now()) / timedelta(seconds=1))
+
+
+def create_clock(mode: Optional[str] = None) -> Clock:
+    """Create a clock from CLOCK_MODE (real, cached or virtual)"""
+    mode = (mode or os.getenv("CLOCK_MODE", "real")).lower()
+    if mode == "cached":
+        return CachedClock(tick_ms=int(os.getenv("CLOCK_TICK_MS", "1000")))
+    if mode == "virtual":
+        return VirtualClock()
+    if mode == "real":
+        return RealClock()
+    raise ValueError(f"Unknown CLOCK_MODE: {mode}")
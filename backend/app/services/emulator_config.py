@@ -0,0 +1,39 @@
+"""
+Runtime-reloadable emulator configuration
+"""
+import os
+from dataclasses import asdict, dataclass, replace
+from typing import Any, Dict
+
+
+@dataclass(frozen=True)
+class EmulatorConfig:
+    """Immutable emulator settings
+
+    The emulator holds a single reference to the current config and updates
+    replace that reference wholesale, so a request that reads the config once
+    sees a consistent set of values even if a reload happens mid-request.
+    """
+    ack_only: bool = False
+    response_delay_ms: int = 500
+    session_timeout_minutes: int = 30
+
+    @classmethod
+    def from_env(cls) -> "EmulatorConfig":
+        return cls(
+            ack_only=os.getenv("ACK_ONLY", "false").lower() == "true",
+            response_delay_ms=int(os.getenv("RESPONSE_DELAY_MS", "500")),
+            session_timeout_minutes=int(os.getenv("SESSION_TIMEOUT_MINUTES", "30"))
+        )
+
+    def updated(self, **changes: Any) -> "EmulatorConfig":
+        """Return a copy with the given (non-None) fields changed"""
+        config = replace(self, **{k: v for k, v in changes.items() if v is not None})
+        if config.response_delay_ms < 0:
+            raise ValueError("response_delay_ms must not be negative")
+        if config.session_timeout_minutes <= 0:
+            raise ValueError("session_timeout_minutes must be positive")
+        return config
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
@@ -0,0 +1,132 @@
+"""
+Foreign exchange - currency conversion and dynamic currency conversion (DCC)
+
+Amounts are integers in minor units (e.g. pence) and rates are Decimals, so
+no money value ever passes through a float. Rates come from a local JSON
+table of units per one base-currency unit:
+
+    {"base": "GBP", "rates": {"GBP": "1", "EUR": "1.1712", ...}}
+"""
+import asyncio
+import json
+import os
+from datetime import datetime
+from decimal import Decimal, InvalidOperation, ROUND_HALF_UP
+from functools import lru_cache
+from typing import Any, Dict, Optional, Tuple
+
+# Precision of the rate shown on the DCC prompt (the conversion itself is unrounded)
+RATE_DISPLAY = Decimal("0.00000001")
+
+DEFAULT_RATES_PATH = os.path.join(os.path.dirname(__file__), "..", "data", "fx_rates.json")
+
+# ISO 4217 minor-unit exponents that differ from the usual 2
+CURRENCY_EXPONENTS = {
+    "JPY": 0, "KRW": 0, "ISK": 0, "CLP": 0, "VND": 0, "XOF": 0, "XAF": 0,
+    "KWD": 3, "BHD": 3, "OMR": 3, "JOD": 3, "TND": 3, "LYD": 3, "IQD": 3,
+}
+
+
+def currency_exponent(currency: str) -> int:
+    """Number of minor-unit digits for a currency"""
+    return CURRENCY_EXPONENTS.get(currency, 2)
+
+
+class FxRateTable:
+    """An immutable set of rates with a bounded memo of conversion results"""
+
+    def __init__(self, base: str, rates: Dict[str, Decimal], cache_size: int = 4096):
+        self.base = base
+        self.rates = rates
+        self.loaded_at = datetime.now()
+        # Per-table cache: a reloaded table starts with a fresh cache
+        self.convert = lru_cache(maxsize=cache_size)(self._convert)
+
+    @classmethod
+    def load(cls, path: str, cache_size: int = 4096) -> "FxRateTable":
+        """Load and validate a rate table from a JSON file; raises ValueError if malformed"""
+        with open(path, "r") as f:
+            data = json.load(f)
+        try:
+            base = str(data["base"]).upper()
+            # Parse from strings so rates are exact; JSON numbers go through str() first
+            rates = {str(code).upper(): Decimal(str(rate)) for code, rate in data["rates"].items()}
+        except (AttributeError, InvalidOperation, KeyError, TypeError) as e:
+            raise ValueError(f"Malformed FX rate table: {e!r}") from e
+        rates.setdefault(base, Decimal(1))
+        if any(not rate.is_finite() or rate <= 0 for rate in rates.values()):
+            raise ValueError("FX rates must be positive")
+        return cls(base, rates, cache_size)
+
+    def supports(self, currency: str) -> bool:
+        return currency in self.rates
+
+    def rate(self, source: str, target: str) -> Decimal:
+        """Units of `target` per one unit of `source`"""
+        return self.rates[target] / self.rates[source]
+
+    def _convert(self, amount: int, source: str, target: str, markup_percent: Decimal) -> Tuple[int, Decimal]:
+        """Convert minor units of `source` to minor units of `target`, rounding half up"""
+        rate = self.rate(source, target) * (1 + markup_percent / 100)
+        major = Decimal(amount).scaleb(-currency_exponent(source)) * rate
+        exponent = currency_exponent(target)
+        converted = major.quantize(Decimal(1).scaleb(-exponent), rounding=ROUND_HALF_UP)
+        return int(converted.scaleb(exponent)), rate
+
+
+class FxService:
+    """Holds the current rate table and swaps in reloaded tables atomically"""
+
+    def __init__(self, path: Optional[str] = None, default_currency: str = "GBP",
+                 dcc_markup_percent: str = "0", cache_size: int = 4096):
+        self.path = path or DEFAULT_RATES_PATH
+        self.default_currency = default_currency.upper()
+        self.dcc_markup_percent = Decimal(dcc_markup_percent)
+        self.cache_size = cache_size
+        self.table = self._load(self.path)
+
+    def _load(self, path: str) -> FxRateTable:
+        """Load a table and check it can price the default currency"""
+        table = FxRateTable.load(path, self.cache_size)
+        if not table.supports(self.default_currency):
+            raise ValueError(f"FX rate table has no rate for default currency {self.default_currency}")
+        return table
+
+    def reload(self, path: Optional[str] = None) -> FxRateTable:
+        """Load a new table and swap it in; requests keep using the old one until then"""
+        table = self._load(path or self.path)
+        self.path = path or self.path
+        self.table = table
+        return table
+
+    async def reload_async(self, path: Optional[str] = None) -> FxRateTable:
+        """Reload on a worker thread so file I/O and parsing never block the event loop"""
+        return await asyncio.to_thread(self.reload, path)
+
+    def dcc_offer(self, amount: int, currency: str, card_currency: str,
+                  table: Optional[FxRateTable] = None) -> Dict[str, Any]:
+        """Price an amount in the cardholder's currency, including the DCC markup; raises ValueError if the amount overflows"""
+        table = table or self.table
+        try:
+            card_amount, rate = table.convert(amount, currency, card_currency, self.dcc_markup_percent)
+        except InvalidOperation:
+            raise ValueError(f"Amount {amount} is too large to convert")
+        return {
+            "card_currency": card_currency,
+            "card_amount": card_amount,
+            "rate": str(rate.quantize(RATE_DISPLAY)),
+            "markup_percent": str(self.dcc_markup_percent)
+        }
+
+    def info(self) -> Dict[str, Any]:
+        table = self.table
+        cache = table.convert.cache_info()
+        return {
+            "path": os.path.abspath(self.path),
+            "base": table.base,
+            "currencies": sorted(table.rates),
+            "default_currency": self.default_currency,
+            "dcc_markup_percent": str(self.dcc_markup_percent),
+            "loaded_at": table.loaded_at.isoformat(),
+            "cache": {"hits": cache.hits, "misses": cache.misses, "size": cache.currsize, "maxsize": cache.maxsize}
+        }
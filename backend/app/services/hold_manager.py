@@ -0,0 +1,105 @@
+"""
+Pre-authorization hold management for PreAuth / IncrementalAuth / Completion
+"""
+import heapq
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+from .clock import Clock, RealClock
+
+# Longest lifetime a client may request for a hold (30 days)
+MAX_EXPIRY_MINUTES = 30 * 24 * 60
+
+
+class Hold:
+    """An open pre-authorization hold"""
+    __slots__ = ("txn_id", "amount", "auth_code", "session_id", "created_at", "expires_at", "increments")
+
+    def __init__(self, txn_id: str, amount: int, auth_code: str, session_id: Optional[str],
+                 created_at: float, expires_at: float):
+        self.txn_id = txn_id
+        self.amount = amount
+        self.auth_code = auth_code
+        self.session_id = session_id
+        self.created_at = created_at
+        self.expires_at = expires_at
+        self.increments = 0
+
+    def expires_at_iso(self) -> str:
+        return datetime.fromtimestamp(self.expires_at).isoformat()
+
+
+class HoldManager:
+    """Tracks open holds by txn_id and expires them from a min-heap of deadlines
+
+    Expiry is driven by the heap rather than by scanning every hold: each
+    operation pops only the deadlines that have already passed. Extending a
+    hold pushes a new deadline and leaves the old entry to be skipped when it
+    surfaces, so the heap is compacted whenever stale entries dominate it.
+    """
+
+    def __init__(self, default_expiry_minutes: int = 1440, clock: Optional[Clock] = None):
+        self.holds: Dict[str, Hold] = {}
+        self.default_expiry_minutes = default_expiry_minutes
+        self.clock = clock or RealClock()
+        self._deadlines: List[Tuple[float, str]] = []
+        self.expired_count = 0
+
+    def _deadline(self, expiry_minutes: Optional[float]) -> float:
+        minutes = self.default_expiry_minutes if expiry_minutes is None else expiry_minutes
+        return self.clock.time() + minutes * 60
+
+    def _schedule(self, hold: Hold):
+        heapq.heappush(self._deadlines, (hold.expires_at, hold.txn_id))
+        if len(self._deadlines) > 2 * len(self.holds) + 1024:
+            self._compact()
+
+    def _compact(self):
+        """Rebuild the heap from the live holds, dropping stale deadlines"""
+        self._deadlines = [(hold.expires_at, txn_id) for txn_id, hold in self.holds.items()]
+        heapq.heapify(self._deadlines)
+
+    def expire_due(self) -> int:
+        """Release every hold whose deadline has passed; returns how many expired"""
+        now = self.clock.time()
+        expired = 0
+        while self._deadlines and self._deadlines[0][0] <= now:
+            deadline, txn_id = heapq.heappop(self._deadlines)
+            hold = self.holds.get(txn_id)
+            # Skip entries superseded by an extension, or for holds already consumed
+            if hold is not None and hold.expires_at == deadline:
+                del self.holds[txn_id]
+                expired += 1
+        self.expired_count += expired
+        return expired
+
+    def create(self, txn_id: str, amount: int, auth_code: str, session_id: Optional[str] = None,
+               expiry_minutes: Optional[float] = None) -> Hold:
+        """Open a new hold"""
+        self.expire_due()
+        hold = Hold(txn_id, amount, auth_code, session_id, self.clock.time(), self._deadline(expiry_minutes))
+        self.holds[txn_id] = hold
+        self._schedule(hold)
+        return hold
+
+    def get(self, txn_id: str) -> Optional[Hold]:
+        """Get an open (unexpired) hold"""
+        self.expire_due()
+        return self.holds.get(txn_id)
+
+    def increment(self, txn_id: str, amount: int, expiry_minutes: Optional[float] = None) -> Optional[Hold]:
+        """Add to an open hold and push its expiry out"""
+        hold = self.get(txn_id)
+        if hold is None:
+            return None
+        hold.amount += amount
+        hold.increments += 1
+        deadline = self._deadline(expiry_minutes)
+        if deadline > hold.expires_at:
+            hold.expires_at = deadline
+            self._schedule(hold)
+        return hold
+
+    def consume(self, txn_id: str) -> Optional[Hold]:
+        """Remove an open hold (captured or reversed)"""
+        self.expire_due()
+        return self.holds.pop(txn_id, None)
@@ -0,0 +1,107 @@
+"""
+Graceful drain - stop taking new commands, finish in-flight ones, close WebSockets
+"""
+import asyncio
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Set
+
+from fastapi import WebSocket
+
+# WebSocket close code 1001 (going away) tells clients to reconnect elsewhere
+WS_CLOSE_GOING_AWAY = 1001
+
+
+class DrainController:
+    """Tracks in-flight commands and open WebSockets so they can be drained"""
+
+    def __init__(self):
+        self.draining = False
+        self.inflight = 0
+        self.websockets: Set[WebSocket] = set()
+        self._idle = asyncio.Event()
+        self._idle.set()
+
+    @contextmanager
+    def track(self):
+        """Count a command as in flight for the duration of the block"""
+        self.inflight += 1
+        self._idle.clear()
+        try:
+            yield
+        finally:
+            self.inflight -= 1
+            if self.inflight == 0:
+                self._idle.set()
+
+    def register(self, websocket: WebSocket):
+        self.websockets.add(websocket)
+
+    def unregister(self, websocket: WebSocket):
+        self.websockets.discard(websocket)
+
+    def resume(self):
+        """Leave drain mode and accept commands again"""
+        self.draining = False
+
+    async def drain(self, timeout: float = 30.0) -> Dict[str, Any]:
+        """Stop accepting commands, wait for in-flight ones, then close all WebSockets"""
+        self.draining = True
+        started = time.perf_counter()
+        try:
+            await asyncio.wait_for(self._idle.wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+
+        closed = 0
+        for websocket in list(self.websockets):
+            try:
+                await websocket.close(code=WS_CLOSE_GOING_AWAY, reason="server draining")
+                closed += 1
+            except Exception:
+                pass
+            self.unregister(websocket)
+
+        return {
+            "draining": True,
+            "inflight_remaining": self.inflight,
+            "websockets_closed": closed,
+            "elapsed_ms": round((time.perf_counter() - started) * 1000, 3)
+        }
+
+
+class DrainMiddleware:
+    """ASGI middleware that counts in-flight API requests and rejects new ones while draining"""
+
+    def __init__(self, app, controller: DrainController):
+        self.app = app
+        self.controller = controller
+
+    async def __call__(self, scope, receive, send):
+        path = scope.get("path", "")
+        if scope["type"] != "http" or not path.startswith("/api/v1/") or path.startswith("/api/v1/admin"):
+            await self.app(scope, receive, send)
+            return
+
+        if self.controller.draining:
+            await send({
+                "type": "http.response.start",
+                "status": 503,
+                "headers": [(b"content-type", b"application/json"), (b"retry-after", b"1")]
+            })
+            await send({"type": "http.response.body", "body": b'{"detail":"Emulator is draining"}'})
+            return
+
+        with self.controller.track():
+            await self.app(scope, receive, send)
+
+
+# Shared singleton instance
+_drain_instance = None
+
+def get_drain_controller() -> DrainController:
+    """Get the shared drain controller"""
+    global _drain_instance
+    if _drain_instance is None:
+        _drain_instance = DrainController()
+    return _drain_instance
@@ -0,0 +1,219 @@
+"""
+Opt-in request profiling - per-phase timers, event-loop lag and a sampling profiler
+
+Enabled with PROFILING_ENABLED=true. When disabled, `profile_phase()` returns a
+shared no-op context manager, so the instrumentation points cost a ContextVar
+lookup and nothing else.
+"""
+import asyncio
+import heapq
+import os
+import sys
+import threading
+import time
+from collections import Counter, deque
+from contextlib import contextmanager, nullcontext
+from contextvars import ContextVar
+from typing import Any, Dict, List, Optional
+
+_NULL_PHASE = nullcontext()
+
+
+class RequestProfile:
+    """Timing breakdown of a single request or WebSocket message"""
+    __slots__ = ("path", "cmd", "req_id", "started", "first_mark", "last_mark", "phases", "total_ms")
+
+    def __init__(self, path: str):
+        self.path = path
+        self.cmd: Optional[str] = None
+        self.req_id: Optional[str] = None
+        self.started = time.perf_counter()
+        self.first_mark: Optional[float] = None
+        self.last_mark: Optional[float] = None
+        self.phases: Dict[str, float] = {}
+        self.total_ms = 0.0
+
+    @contextmanager
+    def phase(self, name: str):
+        """Time a named phase; repeated phases accumulate"""
+        start = time.perf_counter()
+        if self.first_mark is None:
+            self.first_mark = start
+        try:
+            yield
+        finally:
+            end = time.perf_counter()
+            self.last_mark = end
+            self.phases[name] = self.phases.get(name, 0.0) + (end - start) * 1000
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "path": self.path,
+            "cmd": self.cmd,
+            "req_id": self.req_id,
+            "total_ms": round(self.total_ms, 3),
+            "phases": {name: round(ms, 3) for name, ms in self.phases.items()}
+        }
+
+
+_current_profile: ContextVar[Optional[RequestProfile]] = ContextVar("current_profile", default=None)
+
+
+def profile_phase(name: str):
+    """Time a phase of the current request, if it is being profiled"""
+    profile = _current_profile.get()
+    if profile is None:
+        return _NULL_PHASE
+    return profile.phase(name)
+
+
+def annotate_request(req_id: str, cmd: str):
+    """Attach the command and req_id to the current request's profile"""
+    profile = _current_profile.get()
+    if profile is not None:
+        profile.req_id = req_id
+        profile.cmd = cmd
+
+
+class Profiler:
+    """Collects request profiles into a ring buffer and tracks event-loop lag"""
+
+    def __init__(self, enabled: bool = False, buffer_size: int = 1000,
+                 lag_interval_ms: int = 100):
+        self.enabled = enabled
+        self.recent: deque = deque(maxlen=buffer_size)
+        self.lag_interval = lag_interval_ms / 1000.0
+        self.loop_lag = {"last_ms": 0.0, "max_ms": 0.0, "samples": 0}
+        self._lag_task: Optional[asyncio.Task] = None
+        self._sampling = threading.Lock()
+
+    def begin(self, path: str) -> Optional[RequestProfile]:
+        """Start profiling a request and make it current for this task"""
+        if not self.enabled:
+            return None
+        profile = RequestProfile(path)
+        _current_profile.set(profile)
+        return profile
+
+    def end(self, profile: Optional[RequestProfile], response_started: Optional[float] = None):
+        """Finish a profile and add it to the ring buffer
+
+        For HTTP requests, time before the first phase is reported as
+        "validation" (routing and request parsing), time between the last phase
+        and the response start as "encode" (response model validation and JSON
+        encoding) and the rest as "send".
+        """
+        if profile is None:
+            return
+        end = time.perf_counter()
+        if response_started is not None:
+            if profile.first_mark is not None:
+                profile.phases["validation"] = (profile.first_mark - profile.started) * 1000
+                profile.phases["encode"] = (response_started - profile.last_mark) * 1000
+            profile.phases["send"] = (end - response_started) * 1000
+        profile.total_ms = (end - profile.started) * 1000
+        self.recent.append(profile)
+        _current_profile.set(None)
+
+    def slowest(self, limit: int = 20) -> List[Dict[str, Any]]:
+        """The N slowest requests currently in the ring buffer"""
+        return [p.to_dict() for p in heapq.nlargest(limit, list(self.recent), key=lambda p: p.total_ms)]
+
+    def start_loop_monitor(self):
+        """Start measuring event-loop lag (call from within the running loop)"""
+        if self.enabled and self._lag_task is None:
+            self._lag_task = asyncio.get_running_loop().create_task(self._monitor_loop_lag())
+
+    async def stop_loop_monitor(self):
+        if self._lag_task is not None:
+            self._lag_task.cancel()
+            try:
+                await self._lag_task
+            except asyncio.CancelledError:
+                pass
+            self._lag_task = None
+
+    async def _monitor_loop_lag(self):
+        while True:
+            scheduled = time.perf_counter()
+            await asyncio.sleep(self.lag_interval)
+            lag_ms = max(0.0, (time.perf_counter() - scheduled - self.lag_interval) * 1000)
+            self.loop_lag["last_ms"] = round(lag_ms, 3)
+            self.loop_lag["max_ms"] = max(self.loop_lag["max_ms"], round(lag_ms, 3))
+            self.loop_lag["samples"] += 1
+
+    def sample(self, thread_id: int, seconds: float, interval_ms: float = 5.0,
+               limit: int = 50) -> Dict[str, Any]:
+        """Sample the stack of a thread for a fixed time (blocking - run off the event loop)
+
+        Returns the most frequent stacks in collapsed "frame;frame;frame" form,
+        outermost frame first, as consumed by flame graph tools.
+        """
+        if not self._sampling.acquire(blocking=False):
+            raise RuntimeError("A sampling profile is already running")
+        try:
+            stacks: Counter = Counter()
+            samples = 0
+            interval = interval_ms / 1000.0
+            deadline = time.perf_counter() + seconds
+            while time.perf_counter() < deadline:
+                frame = sys._current_frames().get(thread_id)
+                if frame is not None:
+                    parts = []
+                    while frame is not None:
+                        code = frame.f_code
+                        parts.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})")
+                        frame = frame.f_back
+                    stacks[";".join(reversed(parts))] += 1
+                    samples += 1
+                time.sleep(interval)
+            return {
+                "seconds": seconds,
+                "interval_ms": interval_ms,
+                "samples": samples,
+                "stacks": [{"stack": stack, "count": count} for stack, count in stacks.most_common(limit)]
+            }
+        finally:
+            self._sampling.release()
+
+
+class ProfilingMiddleware:
+    """ASGI middleware that profiles each HTTP request"""
+
+    def __init__(self, app, profiler: Profiler):
+        self.app = app
+        self.profiler = profiler
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        profile = self.profiler.begin(scope["path"])
+        response_started = None
+
+        async def send_wrapper(message):
+            nonlocal response_started
+            if message["type"] == "http.response.start":
+                response_started = time.perf_counter()
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            self.profiler.end(profile, response_started)
+
+
+# Shared singleton instance
+_profiler_instance = None
+
+def get_profiler() -> Profiler:
+    """Get the shared profiler, configured from PROFILING_* environment variables"""
+    global _profiler_instance
+    if _profiler_instance is None:
+        _profiler_instance = Profiler(
+            enabled=os.getenv("PROFILING_ENABLED", "false").lower() == "true",
+            buffer_size=int(os.getenv("PROFILING_BUFFER_SIZE", "1000")),
+            lag_interval_ms=int(os.getenv("PROFILING_LAG_INTERVAL_MS", "100"))
+        )
+    return _profiler_instance
@@ -1,44 +1,108 @@
 """
 Session management for terminal emulator
+
+Sessions are kept compact so soak runs can hold 100k+ of them: slotted
+objects, monotonic float timestamps, interned user/cmd strings and
+transactions stored as tuples. Datetimes and ISO strings are only built
+when a session is read out.
 """
-import time
-from typing import Dict, Optional
-from datetime import datetime, timedelta
+import sys
+from typing import Any, Dict, List, Optional, Tuple
+from datetime import datetime
+from .clock import Clock, RealClock
+
+# (card currency, card amount, accepted) of a DCC offer
+DccRecord = Tuple[str, int, bool]
+# (txn_id, cmd, amount, monotonic timestamp, currency, DCC outcome)
+TransactionRecord = Tuple[str, str, Optional[float], float, Optional[str], Optional[DccRecord]]
+
+
+def _intern(value: Any) -> Any:
+    return sys.intern(value) if type(value) is str else value
 
 
 class Session:
     """Represents an active session"""
-    def __init__(self, session_id: str, user: str = "default"):
+    __slots__ = ("session_id", "user", "is_active", "_clock", "_created", "_last_activity", "_transactions")
+
+    def __init__(self, session_id: str, user: str = "default", clock: Optional[Clock] = None):
+        self._clock = clock or RealClock()
         self.session_id = session_id
-        self.user = user
-        self.created_at = datetime.now()
-        self.last_activity = datetime.now()
+        self.user = _intern(user)
+        self._created = self._clock.monotonic()
+        self._last_activity = self._created
         self.is_active = True
-        self.transactions: list = []
+        # Allocated on the first transaction - most sessions in soak runs have none or few
+        self._transactions: Optional[List[TransactionRecord]] = None
+
+    def _to_datetime(self, mono: float) -> datetime:
+        """Convert a monotonic timestamp to a wall-clock datetime"""
+        return datetime.fromtimestamp(mono + self._clock.time() - self._clock.monotonic())
+
+    @property
+    def created_at(self) -> datetime:
+        return self._to_datetime(self._created)
+
+    @property
+    def last_activity(self) -> datetime:
+        return self._to_datetime(self._last_activity)
+
+    def idle_seconds(self) -> float:
+        """Seconds since the last activity"""
+        return self._clock.monotonic() - self._last_activity
 
     def update_activity(self):
         """Update last activity timestamp"""
-        self.last_activity = datetime.now()
+        self._last_activity = self._clock.monotonic()
+
+    def add_transaction(self, txn_id: str, cmd: str, amount: Optional[float] = None,
+                        currency: Optional[str] = None, dcc: Optional[Dict[str, Any]] = None):
+        """Add a transaction to session history, with its currency and any DCC offer outcome"""
+        if self._transactions is None:
+            self._transactions = []
+        dcc_record = None
+        if dcc is not None:
+            dcc_record = (sys.intern(dcc["card_currency"]), dcc["card_amount"], dcc["accepted"])
+        self._transactions.append(
+            (txn_id, sys.intern(cmd), amount, self._clock.monotonic(), _intern(currency), dcc_record)
+        )
 
-    def add_transaction(self, txn_id: str, cmd: str, amount: Optional[float] = None):
-        """Add a transaction to session history"""
-        self.transactions.append({
-            "txn_id": txn_id,
-            "cmd": cmd,
-            "amount": amount,
-            "timestamp": datetime.now().isoformat()
-        })
+    @property
+    def transactions(self) -> List[Dict[str, Any]]:
+        """Transaction history, formatted on read"""
+        return [
+            {
+                "txn_id": txn_id,
+                "cmd": cmd,
+                "amount": amount,
+                "currency": currency,
+                "dcc": dcc and {"card_currency": dcc[0], "card_amount": dcc[1], "accepted": dcc[2]},
+                "timestamp": self._to_datetime(mono).isoformat()
+            }
+            for txn_id, cmd, amount, mono, currency, dcc in self._transactions or ()
+        ]
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "session_id": self.session_id,
+            "user": self.user,
+            "is_active": self.is_active,
+            "created_at": self.created_at.isoformat(),
+            "last_activity": self.last_activity.isoformat(),
+            "transactions": self.transactions
+        }
 
 
 class SessionManager:
     """Manages active sessions"""
-    def __init__(self, timeout_minutes: int = 30):
+    def __init__(self, timeout_minutes: int = 30, clock: Optional[Clock] = None):
         self.sessions: Dict[str, Session] = {}
         self.timeout_minutes = timeout_minutes
+        self.clock = clock or RealClock()
 
     def create_session(self, session_id: str, user: str = "default") -> Session:
         """Create a new session"""
-        session = Session(session_id, user)
+        session = Session(session_id, user, self.clock)
         self.sessions[session_id] = session
         return session
 
@@ -47,7 +111,7 @@ class SessionManager:
         session = self.sessions.get(session_id)
         if session and session.is_active:
             # Check timeout
-            if datetime.now() - session.last_activity > timedelta(minutes=self.timeout_minutes):
+            if session.idle_seconds() > self.timeout_minutes * 60:
                 session.is_active = False
                 return None
             session.update_activity()
@@ -64,12 +128,10 @@ class SessionManager:
 
     def cleanup_expired(self):
         """Remove expired sessions"""
-        now = datetime.now()
+        cutoff = self.clock.monotonic() - self.timeout_minutes * 60
         expired = [
             sid for sid, session in self.sessions.items()
-            if not session.is_active or 
-            (now - session.last_activity).total_seconds() > self.timeout_minutes * 60
+            if not session.is_active or session._last_activity < cutoff
         ]
         for sid in expired:
             del self.sessions[sid]
-
@@ -1,37 +1,139 @@
 """
 Terminal emulator service - core logic for emulating payment terminal behavior
 """
-import time
+import math
 import os
-from typing import Dict, Any, Optional
-from datetime import datetime
+from typing import Dict, Any, Optional, Tuple
+from .clock import Clock, create_clock
+from .emulator_config import EmulatorConfig
+from .fx import FxService
+from .hold_manager import HoldManager, MAX_EXPIRY_MINUTES
+from .profiler import annotate_request, profile_phase
 from .session_manager import SessionManager, Session
 
 
 class TerminalEmulator:
     """Emulates payment terminal behavior"""
     
-    def __init__(self):
+    def __init__(self, clock: Optional[Clock] = None, config: Optional[EmulatorConfig] = None):
+        self.clock = clock or create_clock()
+        self.config = config or EmulatorConfig.from_env()
         self.session_manager = SessionManager(
-            timeout_minutes=int(os.getenv("SESSION_TIMEOUT_MINUTES", "30"))
+            timeout_minutes=self.config.session_timeout_minutes,
+            clock=self.clock
         )
-        self.ack_only = os.getenv("ACK_ONLY", "false").lower() == "true"
-        self.response_delay_ms = int(os.getenv("RESPONSE_DELAY_MS", "500"))
-        self.transaction_counter = int(time.time())
+        self.hold_manager = HoldManager(
+            default_expiry_minutes=int(os.getenv("HOLD_EXPIRY_MINUTES", "1440")),
+            clock=self.clock
+        )
+        self.fx = FxService(
+            path=os.getenv("FX_RATES_PATH") or None,
+            default_currency=os.getenv("DEFAULT_CURRENCY", "GBP"),
+            dcc_markup_percent=os.getenv("DCC_MARKUP_PERCENT", "3.0"),
+            cache_size=int(os.getenv("FX_CACHE_SIZE", "4096"))
+        )
+        # IDs and auth codes come from counters, not clock readings, so they stay
+        # unique when the clock is coarse (cached) or standing still (virtual)
+        self.transaction_counter = int(self.clock.time())
+        self.session_counter = self.transaction_counter
+        self.auth_counter = self.transaction_counter
         
+    @property
+    def ack_only(self) -> bool:
+        return self.config.ack_only
+    
+    @property
+    def response_delay_ms(self) -> int:
+        return self.config.response_delay_ms
+    
+    def update_config(self, **changes: Any) -> EmulatorConfig:
+        """Atomically swap in a new configuration (None values are left unchanged)"""
+        config = self.config.updated(**changes)
+        self.session_manager.timeout_minutes = config.session_timeout_minutes
+        self.config = config
+        return config
+    
     def generate_txn_id(self, prefix: str = "T") -> str:
         """Generate a transaction ID"""
         self.transaction_counter += 1
         return f"{prefix}{self.transaction_counter}"
     
+    def generate_session_id(self) -> str:
+        """Generate a session ID"""
+        self.session_counter += 1
+        return f"sess_{self.session_counter}"
+    
     def generate_auth_code(self) -> str:
         """Generate an authorization code"""
-        return f"{int(time.time()) % 1000000:06d}"
+        self.auth_counter += 1
+        return f"{self.auth_counter % 1000000:06d}"
+    
+    def create_fail(self, req_id: str, cmd: str, reason: str, detail: str, **fields) -> Dict[str, Any]:
+        """Create a failed result"""
+        return {
+            "type": "result",
+            "req_id": req_id,
+            "cmd": cmd,
+            "status": "fail",
+            "reason": reason,
+            "detail": detail,
+            **fields,
+            "ts": self.clock.isoformat()
+        }
+    
+    @staticmethod
+    def parse_minor_units(value: Any) -> Optional[int]:
+        """Parse a non-negative amount in minor units (e.g. pence), or None if invalid"""
+        if isinstance(value, bool):
+            return None
+        if isinstance(value, float) and value.is_integer():
+            value = int(value)
+        if isinstance(value, str) and value.isascii() and value.isdecimal():
+            value = int(value)
+        if isinstance(value, int) and value >= 0:
+            return value
+        return None
+    
+    @staticmethod
+    def parse_expiry_minutes(args: Dict[str, Any]) -> Optional[float]:
+        """Read an optional hold lifetime in (0, MAX_EXPIRY_MINUTES]; raises ValueError if malformed"""
+        value = args.get("expiry_minutes")
+        if value is None:
+            return None
+        if (isinstance(value, bool) or not isinstance(value, (int, float))
+                or not math.isfinite(value) or not 0 < value <= MAX_EXPIRY_MINUTES):
+            raise ValueError(f"expiry_minutes must be a number between 0 and {MAX_EXPIRY_MINUTES}")
+        return value
+    
+    def resolve_currency(self, args: Dict[str, Any], amount: int) -> Tuple[Dict[str, Any], Optional[Tuple[str, str]]]:
+        """Work out the transaction currency and any DCC offer for an amount
+        
+        Returns (result fields, None) or ({}, (reason, detail)) if a currency is
+        unsupported or the amount is too large to convert.
+        """
+        table = self.fx.table
+        currency = str(args.get("currency") or self.fx.default_currency).upper()
+        if not table.supports(currency):
+            return {}, ("unsupported_currency", f"No FX rate for {currency}")
+        fields: Dict[str, Any] = {"currency": currency}
+        
+        # Offer dynamic currency conversion when the card is in another currency
+        card_currency = str(args.get("card_currency") or currency).upper()
+        if card_currency != currency:
+            if not table.supports(card_currency):
+                return {}, ("unsupported_currency", f"No FX rate for {card_currency}")
+            try:
+                offer = self.fx.dcc_offer(amount, currency, card_currency, table)
+            except ValueError as e:
+                return {}, ("invalid_amount", str(e))
+            offer["accepted"] = args.get("dcc_accepted", True) is not False
+            fields["dcc"] = offer
+        return fields, None
     
     def process_login(self, req_id: str, args: Dict[str, Any]) -> Dict[str, Any]:
         """Process login request"""
         user = args.get("user", "default")
-        session_id = f"sess_{int(time.time())}"
+        session_id = self.generate_session_id()
         session = self.session_manager.create_session(session_id, user)
         
         return {
@@ -47,7 +149,7 @@ class TerminalEmulator:
                 "magstripe": True,
                 "version": "1.0"
             },
-            "ts": datetime.now().isoformat()
+            "ts": self.clock.isoformat()
         }
     
     def process_logout(self, req_id: str, session_id: Optional[str] = None) -> Dict[str, Any]:
@@ -60,20 +162,26 @@ class TerminalEmulator:
             "req_id": req_id,
             "cmd": "Logout",
             "status": "success",
-            "ts": datetime.now().isoformat()
+            "ts": self.clock.isoformat()
         }
     
     def process_sale(self, req_id: str, args: Dict[str, Any], session_id: Optional[str] = None) -> Dict[str, Any]:
         """Process sale request"""
-        amount = args.get("amount", 0)
+        amount = self.parse_minor_units(args.get("amount", 0))
+        if amount is None:
+            return self.create_fail(req_id, "Sale", "invalid_amount", "Amount must be a whole number of minor units")
+        currency_fields, error = self.resolve_currency(args, amount)
+        if error:
+            return self.create_fail(req_id, "Sale", *error)
         txn_id = self.generate_txn_id("T")
         auth_code = self.generate_auth_code()
         
         # Add to session if available
         if session_id:
-            session = self.session_manager.get_session(session_id)
+            with profile_phase("session"):
+                session = self.session_manager.get_session(session_id)
             if session:
-                session.add_transaction(txn_id, "Sale", amount)
+                session.add_transaction(txn_id, "Sale", amount, currency_fields["currency"], currency_fields.get("dcc"))
         
         return {
             "type": "result",
@@ -83,19 +191,26 @@ class TerminalEmulator:
             "txn_id": txn_id,
             "auth_code": auth_code,
             "amount": amount,
-            "ts": datetime.now().isoformat()
+            **currency_fields,
+            "ts": self.clock.isoformat()
         }
     
     def process_refund(self, req_id: str, args: Dict[str, Any], session_id: Optional[str] = None) -> Dict[str, Any]:
         """Process refund request"""
-        amount = args.get("amount", 0)
+        amount = self.parse_minor_units(args.get("amount", 0))
+        if amount is None:
+            return self.create_fail(req_id, "Refund", "invalid_amount", "Amount must be a whole number of minor units")
+        currency_fields, error = self.resolve_currency(args, amount)
+        if error:
+            return self.create_fail(req_id, "Refund", *error)
         original_txn_id = args.get("original_txn_id")
         txn_id = self.generate_txn_id("R")
         
         if session_id:
-            session = self.session_manager.get_session(session_id)
+            with profile_phase("session"):
+                session = self.session_manager.get_session(session_id)
             if session:
-                session.add_transaction(txn_id, "Refund", amount)
+                session.add_transaction(txn_id, "Refund", amount, currency_fields["currency"], currency_fields.get("dcc"))
         
         return {
             "type": "result",
@@ -105,7 +220,8 @@ class TerminalEmulator:
             "txn_id": txn_id,
             "original_txn_id": original_txn_id,
             "amount": amount,
-            "ts": datetime.now().isoformat()
+            **currency_fields,
+            "ts": self.clock.isoformat()
         }
     
     def process_reversal(self, req_id: str, args: Dict[str, Any]) -> Dict[str, Any]:
@@ -118,7 +234,7 @@ class TerminalEmulator:
             "cmd": "Reversal",
             "status": "success",
             "txn_id": txn_id,
-            "ts": datetime.now().isoformat()
+            "ts": self.clock.isoformat()
         }
     
     def process_cancellation(self, req_id: str, args: Dict[str, Any]) -> Dict[str, Any]:
@@ -131,36 +247,132 @@ class TerminalEmulator:
             "cmd": "Cancellation",
             "status": "success",
             "txn_id": txn_id,
-            "ts": datetime.now().isoformat()
+            "ts": self.clock.isoformat()
+        }
+    
+    def process_preauth(self, req_id: str, args: Dict[str, Any], session_id: Optional[str] = None) -> Dict[str, Any]:
+        """Process pre-authorization request - place a hold for a later Completion"""
+        amount = self.parse_minor_units(args.get("amount"))
+        if not amount:
+            return self.create_fail(req_id, "PreAuth", "invalid_amount",
+                                    "Amount must be a positive whole number of minor units")
+        
+        try:
+            expiry_minutes = self.parse_expiry_minutes(args)
+        except ValueError as e:
+            return self.create_fail(req_id, "PreAuth", "invalid_expiry", str(e))
+        
+        txn_id = self.generate_txn_id("P")
+        auth_code = self.generate_auth_code()
+        hold = self.hold_manager.create(txn_id, amount, auth_code, session_id, expiry_minutes)
+        
+        if session_id:
+            with profile_phase("session"):
+                session = self.session_manager.get_session(session_id)
+            if session:
+                session.add_transaction(txn_id, "PreAuth", amount)
+        
+        return {
+            "type": "result",
+            "req_id": req_id,
+            "cmd": "PreAuth",
+            "status": "success",
+            "txn_id": txn_id,
+            "auth_code": auth_code,
+            "amount": amount,
+            "expires_at": hold.expires_at_iso(),
+            "ts": self.clock.isoformat()
+        }
+    
+    def process_incremental_auth(self, req_id: str, args: Dict[str, Any]) -> Dict[str, Any]:
+        """Process incremental authorization - add to an open pre-auth hold"""
+        txn_id = args.get("txn_id")
+        if not isinstance(txn_id, str):
+            return self.create_fail(req_id, "IncrementalAuth", "hold_not_found",
+                                    "No open pre-authorization for txn_id", txn_id=txn_id)
+        amount = self.parse_minor_units(args.get("amount"))
+        if not amount:
+            return self.create_fail(req_id, "IncrementalAuth", "invalid_amount",
+                                    "Amount must be a positive whole number of minor units", txn_id=txn_id)
+        
+        try:
+            expiry_minutes = self.parse_expiry_minutes(args)
+        except ValueError as e:
+            return self.create_fail(req_id, "IncrementalAuth", "invalid_expiry", str(e), txn_id=txn_id)
+        
+        hold = self.hold_manager.increment(txn_id, amount, expiry_minutes)
+        if hold is None:
+            return self.create_fail(req_id, "IncrementalAuth", "hold_not_found",
+                                    "No open pre-authorization for txn_id", txn_id=txn_id)
+        
+        return {
+            "type": "result",
+            "req_id": req_id,
+            "cmd": "IncrementalAuth",
+            "status": "success",
+            "txn_id": txn_id,
+            "auth_code": self.generate_auth_code(),
+            "amount": amount,
+            "total_amount": hold.amount,
+            "expires_at": hold.expires_at_iso(),
+            "ts": self.clock.isoformat()
         }
     
     def process_completion(self, req_id: str, args: Dict[str, Any]) -> Dict[str, Any]:
-        """Process completion advice request"""
+        """Process completion advice request - capture and close a pre-auth hold"""
         txn_id = args.get("txn_id")
+        hold = self.hold_manager.get(txn_id) if isinstance(txn_id, str) else None
+        if hold is None:
+            return self.create_fail(req_id, "Completion", "hold_not_found",
+                                    "No open pre-authorization for txn_id", txn_id=txn_id)
+        
+        # Capture the full hold unless a (smaller) final amount is given
+        amount = self.parse_minor_units(args.get("amount", hold.amount))
+        if amount is None:
+            return self.create_fail(req_id, "Completion", "invalid_amount",
+                                    "Amount must be a whole number of minor units", txn_id=txn_id)
+        if amount > hold.amount:
+            return self.create_fail(req_id, "Completion", "amount_exceeds_hold",
+                                    f"Amount {amount} exceeds held amount {hold.amount}", txn_id=txn_id)
         
+        self.hold_manager.consume(txn_id)
         return {
             "type": "result",
             "req_id": req_id,
             "cmd": "Completion",
             "status": "success",
             "txn_id": txn_id,
-            "ts": datetime.now().isoformat()
+            "auth_code": hold.auth_code,
+            "amount": amount,
+            "released_amount": hold.amount - amount,
+            "ts": self.clock.isoformat()
         }
     
     def process_auto_reversal(self, req_id: str, args: Dict[str, Any]) -> Dict[str, Any]:
-        """Process auto-reversal request"""
+        """Process auto-reversal request - releases the hold when reversing a pre-auth"""
         txn_id = args.get("txn_id")
         reason = args.get("reason", "network_error")
         
-        return {
+        released_amount = None
+        if isinstance(txn_id, str) and txn_id.startswith("P"):
+            hold = self.hold_manager.consume(txn_id)
+            if hold is None:
+                return self.create_fail(req_id, "AutoReversal", "hold_not_found",
+                                        "No open pre-authorization for txn_id", txn_id=txn_id)
+            released_amount = hold.amount
+        
+        result = {
             "type": "result",
             "req_id": req_id,
             "cmd": "AutoReversal",
             "status": "success",
             "txn_id": txn_id,
             "reason": reason,
-            "ts": datetime.now().isoformat()
+            "ts": self.clock.isoformat()
         }
+        if released_amount is not None:
+            result["released_amount"] = released_amount
+        return result
     
     def process_loyalty(self, req_id: str, args: Dict[str, Any]) -> Dict[str, Any]:
         """Process loyalty request"""
@@ -174,11 +386,12 @@ class TerminalEmulator:
             "status": "success",
             "action": action,
             "points": 1000 if action == "enquiry" else None,
-            "ts": datetime.now().isoformat()
+            "ts": self.clock.isoformat()
         }
     
     def create_ack(self, req_id: str, cmd: str, accepted: bool = True) -> Dict[str, Any]:
         """Create ACK response"""
+        annotate_request(req_id, cmd)
         return {
             "type": "ack",
             "req_id": req_id,
@@ -186,9 +399,9 @@ class TerminalEmulator:
             "status": "accepted" if accepted else "rejected"
         }
     
-    def should_send_result(self) -> bool:
-        """Check if result should be sent (not ACK_ONLY mode)"""
-        return not self.ack_only
+    def should_send_result(self, config: Optional[EmulatorConfig] = None) -> bool:
+        """Check if result should be sent (not ACK_ONLY mode), optionally against a config snapshot"""
+        return not (config or self.config).ack_only
 
 
 # Shared singleton instance - all routers use this same instance
@@ -0,0 +1,89 @@
+"""
+Session memory benchmark - bytes per session and per transaction
+
+Run from the backend directory:
+
+    python benchmarks/bench_session_memory.py --sessions 100000 --txns 5
+
+Compares the compact Session in app.services.session_manager against the
+previous dict-based layout (reproduced below as LegacySession), measuring
+allocations with tracemalloc.
+"""
+import argparse
+import gc
+import os
+import sys
+import tracemalloc
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.clock import VirtualClock  # noqa: E402
+from app.services.session_manager import Session  # noqa: E402
+
+CMDS = ("Sale", "Refund", "PreAuth", "Completion")
+
+
+class LegacySession:
+    """The session layout before compaction: __dict__, datetimes and per-txn dicts"""
+    def __init__(self, session_id: str, user: str = "default"):
+        self.session_id = session_id
+        self.user = user
+        self.created_at = datetime.now()
+        self.last_activity = datetime.now()
+        self.is_active = True
+        self.transactions: list = []
+
+    def add_transaction(self, txn_id: str, cmd: str, amount=None):
+        self.transactions.append({
+            "txn_id": txn_id,
+            "cmd": cmd,
+            "amount": amount,
+            "timestamp": datetime.now().isoformat()
+        })
+
+
+def measure(factory, sessions: int, txns: int) -> int:
+    """Allocated bytes to hold `sessions` sessions with `txns` transactions each"""
+    gc.collect()
+    tracemalloc.start()
+    store = {}
+    counter = 0
+    for i in range(sessions):
+        session_id = f"sess_{i}"
+        # Users and commands arrive as fresh strings, as they would from parsed JSON
+        session = factory(session_id, "".join(["user_", str(i % 100)]))
+        for j in range(txns):
+            counter += 1
+            session.add_transaction(f"T{counter}", "".join(CMDS[j % len(CMDS)]), 10000 + j)
+        store[session_id] = session
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del store
+    return current
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sessions", type=int, default=100000)
+    parser.add_argument("--txns", type=int, default=5, help="Transactions per session")
+    args = parser.parse_args()
+
+    clock = VirtualClock()
+    layouts = {
+        "legacy": LegacySession,
+        "compact": lambda session_id, user: Session(session_id, user, clock),
+    }
+
+    print(f"{args.sessions} sessions, {args.txns} transactions each")
+    for name, factory in layouts.items():
+        empty = measure(factory, args.sessions, 0)
+        full = measure(factory, args.sessions, args.txns)
+        per_session = empty / args.sessions
+        per_txn = (full - empty) / (args.sessions * args.txns) if args.txns else 0.0
+        print(f"  {name:<8} {per_session:8.1f} bytes/session   {per_txn:8.1f} bytes/txn   "
+              f"{full / 1024 / 1024:8.1f} MiB total")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+"""
+Startup benchmark - cold import time and time-to-first-response
+
+Run from the backend directory:
+
+    python benchmarks/bench_startup.py --runs 5 --budget-ms 1500
+
+Each run starts a fresh interpreter, so import caches are cold for the app
+(bytecode caches on disk are still used, as they would be in a container).
+Every APP_PROFILE is measured with FAST_START=false and FAST_START=true.
+Time-to-first-response is measured up to the answer to a Login command, so
+it includes emulator construction whether that happens at startup or on
+the first request. Exits non-zero if the worst median exceeds --budget-ms.
+"""
+import json
+import argparse
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+import urllib.request
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+IMPORT_SNIPPET = (
+    "import time; t = time.perf_counter(); import app.main; "
+    "print((time.perf_counter() - t) * 1000)"
+)
+
+
+def free_port() -> int:
+    """Pick an unused local TCP port"""
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def measure_import(env: dict) -> float:
+    """Cold-import app.main in a fresh interpreter, return milliseconds"""
+    out = subprocess.run(
+        [sys.executable, "-c", IMPORT_SNIPPET],
+        cwd=BACKEND_DIR, env=env, check=True, capture_output=True, text=True
+    )
+    return float(out.stdout.strip().splitlines()[-1])
+
+
+def first_command(base: str):
+    """Send a Login command, which needs the emulator"""
+    body = json.dumps({"cmd": "Login", "req_id": "bench", "args": {"user": "bench"}}).encode()
+    request = urllib.request.Request(
+        f"{base}/api/v1/login", data=body, headers={"content-type": "application/json"}
+    )
+    with urllib.request.urlopen(request, timeout=5) as resp:
+        resp.read()
+
+
+def measure_first_response(env: dict, timeout: float = 30.0) -> float:
+    """Start uvicorn, wait for /health, then send the first command; return milliseconds"""
+    port = free_port()
+    base = f"http://127.0.0.1:{port}"
+    started = time.perf_counter()
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app",
+         "--host", "127.0.0.1", "--port", str(port), "--log-level", "warning"],
+        cwd=BACKEND_DIR, env=env
+    )
+    try:
+        while time.perf_counter() - started < timeout:
+            try:
+                with urllib.request.urlopen(f"{base}/health", timeout=1) as resp:
+                    resp.read()
+            except OSError:
+                time.sleep(0.005)
+                continue
+            first_command(base)
+            return (time.perf_counter() - started) * 1000
+        raise RuntimeError(f"Server did not respond within {timeout}s")
+    finally:
+        proc.terminate()
+        proc.wait()
+
+
+def summarize(label: str, samples: list) -> float:
+    median = statistics.median(samples)
+    print(f"{label:<28} median {median:8.1f} ms   min {min(samples):8.1f} ms   max {max(samples):8.1f} ms")
+    return median
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--runs", type=int, default=5, help="Samples per configuration")
+    parser.add_argument("--budget-ms", type=float, default=None,
+                        help="Fail if median time-to-first-response exceeds this")
+    parser.add_argument("--profiles", default="full,api",
+                        help="Comma-separated APP_PROFILE values to compare")
+    parser.add_argument("--fast-start", default="false,true",
+                        help="Comma-separated FAST_START values to compare")
+    args = parser.parse_args()
+
+    worst = 0.0
+    for profile in args.profiles.split(","):
+        for fast_start in args.fast_start.split(","):
+            env = dict(os.environ, APP_PROFILE=profile, FAST_START=fast_start)
+            print(f"APP_PROFILE={profile} FAST_START={fast_start}")
+            imports = [measure_import(env) for _ in range(args.runs)]
+            firsts = [measure_first_response(env) for _ in range(args.runs)]
+            summarize("  cold import", imports)
+            worst = max(worst, summarize("  time-to-first-response", firsts))
+
+    if args.budget_ms is not None and worst > args.budget_ms:
+        print(f"FAIL: time-to-first-response {worst:.1f} ms exceeds budget {args.budget_ms:.1f} ms")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
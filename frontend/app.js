@@ -18,6 +18,8 @@ cmdSelect.addEventListener('change', () => {
         'Logout': '/api/v1/logout',
         'Sale': '/api/v1/payment/sale',
         'Refund': '/api/v1/payment/refund',
+        'PreAuth': '/api/v1/preauth',
+        'IncrementalAuth': '/api/v1/preauth/incremental',
         'Reversal': '/api/v1/reversal',
         'Cancellation': '/api/v1/cancellation',
         'Completion': '/api/v1/completion',
@@ -27,7 +29,7 @@ cmdSelect.addEventListener('change', () => {
     endpointSelect.value = endpointMap[cmd] || '/api/v1/login';
     
     // Update default args
-    if (cmd === 'Sale' || cmd === 'Refund') {
+    if (cmd === 'Sale' || cmd === 'Refund' || cmd === 'PreAuth') {
         argsInput.value = JSON.stringify({ amount: 10000, session_id: '' }, null, 2);
     } else if (cmd === 'Login') {
         argsInput.value = JSON.stringify({ user: 'default' }, null, 2);